@@ -1,13 +1,43 @@
-import asyncio
+import logging
+import ssl
+import httpx
 import openai
 from typing import Dict, Any, List
 from tenacity import retry, wait_random_exponential, stop_after_attempt, retry_if_exception_type
 
+# aiohttp-backed transport is optional; httpx's own transport degrades under high concurrency
+try:
+    from httpx_aiohttp import AiohttpTransport
+except ImportError:
+    AiohttpTransport = None
+
 # Use relative import for config
 from .config import Config
+from .conversation_store import create_conversation_store
+from .circuit_breaker import CircuitBreaker
+
+# Configure logging
+logger = logging.getLogger(__name__)
 
 # Store conversation message history
-conversation_history: Dict[str, List[Dict[str, Any]]] = {}
+conversation_history = create_conversation_store()
+
+# Retry policy for Pearl API calls - only retry on 422 status code (UnprocessableEntityError).
+# Built once at import, so Config retry settings must be changed before this module is imported.
+_RETRY_DECORATOR = retry(
+    wait=wait_random_exponential(min=Config.MIN_RETRY_WAIT, max=Config.MAX_RETRY_WAIT),
+    stop=stop_after_attempt(Config.MAX_RETRIES),
+    retry=retry_if_exception_type(openai.UnprocessableEntityError)
+)
+
+# Process-wide breaker so a Pearl outage fails fast instead of piling up retries
+circuit_breaker = CircuitBreaker(
+    fail_max=Config.CIRCUIT_BREAKER_FAIL_MAX,
+    reset_timeout=Config.CIRCUIT_BREAKER_RESET_TIMEOUT
+)
+
+# Building an SSL context loads the CA bundle from disk, so do it once per process
+shared_ssl_context = ssl.create_default_context()
 
 class PearlApiClient:
     """Client for interacting with Pearl API with conversation tracking"""
@@ -26,38 +56,41 @@ class PearlApiClient:
         if not api_key:
             raise ValueError("API key must be provided")
             
-        self.client = openai.OpenAI(
+        # Reuse one HTTP client so connections and TLS sessions are kept alive
+        limits = httpx.Limits(
+            max_connections=Config.MAX_CONNECTIONS,
+            max_keepalive_connections=Config.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.KEEPALIVE_EXPIRY
+        )
+        transport = None
+        if AiohttpTransport is not None:
+            transport = AiohttpTransport(verify=shared_ssl_context, limits=limits)
+        self.http_client = httpx.AsyncClient(
+            verify=shared_ssl_context,
+            limits=limits,
+            timeout=httpx.Timeout(Config.REQUEST_TIMEOUT),
+            transport=transport
+        )
+        self.client = openai.AsyncOpenAI(
             api_key=api_key,
-            base_url=base_url or Config.PEARL_API_BASE_URL
+            base_url=base_url or Config.PEARL_API_BASE_URL,
+            http_client=self.http_client
         )
     
+    async def close(self) -> None:
+        """Close the underlying HTTP client and release pooled connections"""
+        await self.http_client.aclose()
+    
     def format_messages_for_pearl(self, messages):
-        """Format messages for Pearl API"""
-        formatted_messages = []
-        for message in messages:
-            if isinstance(message, dict):
-                formatted_messages.append(message)
-            else:
-                formatted_messages.append({
-                    "role": message.role,
-                    "content": message.content
-                })
-        return formatted_messages
+        """Format messages for Pearl API, returning the input unchanged when it is already all dicts"""
+        if all(type(message) is dict for message in messages):
+            return messages
+        return [
+            message if isinstance(message, dict) else {"role": message.role, "content": message.content}
+            for message in messages
+        ]
     
-    # Define a custom retry predicate
-    def _is_422_error(self, exception):
-        """Check if an exception represents a 422 status code"""
-        status_code = getattr(exception, 'status_code', None)
-        if hasattr(exception, 'response') and hasattr(exception.response, 'status_code'):
-            status_code = exception.response.status_code
-        return status_code == 422
-
-    @retry(
-        wait=wait_random_exponential(min=Config.MIN_RETRY_WAIT, max=Config.MAX_RETRY_WAIT),
-        stop=stop_after_attempt(Config.MAX_RETRIES),
-        retry=retry_if_exception_type(openai.UnprocessableEntityError)
-    )
-    async def call_api_with_retry(self, messages, session_id, mode):
+    async def call_api_with_retry(self, messages, session_id, mode, track_history: bool = False):
         """
         Call Pearl API with retry logic - only retry on 422 status code (UnprocessableEntityError)
         
@@ -65,62 +98,86 @@ class PearlApiClient:
             messages: List of message objects
             session_id: Session ID for the conversation
             mode: Pearl API mode
-            is_retry: Whether this is a retry attempt
+            track_history: Whether to store the messages and the response in conversation history
+            
+        Raises:
+            CircuitBreakerOpen: If too many recent calls failed and the Pearl API is being given time to recover
         """
+        # Format once; retries resend the same payload
+        formatted_messages = self.format_messages_for_pearl(messages)
         metadata = {
             "sessionId": session_id,
             "mode": mode
         }
 
+        response = await self._create_completion(formatted_messages, metadata)
+        if not track_history:
+            return response
+        
+        # Store the response in conversation history
+        if not await conversation_history.contains(session_id):
+            # Initialize with the user's messages first, copying only a list the caller still owns
+            if formatted_messages is messages:
+                formatted_messages = list(messages)
+            await conversation_history.set(session_id, formatted_messages)
+        
+        # Add the assistant's response
+        await conversation_history.append(session_id, {
+            "role": "assistant",
+            "content": response.choices[0].message.content
+        })
+        
+        return response
+
+    @_RETRY_DECORATOR
+    async def _create_completion(self, formatted_messages, metadata):
+        """
+        Send one chat completion request to Pearl API, retried by tenacity on 422
+        
+        Args:
+            formatted_messages: Messages already formatted for Pearl API
+            metadata: Request metadata with session ID and mode
+        """
+        trial = circuit_breaker.before_call()
         try:
-            # Create a new client for each request to avoid connection issues
-            client = openai.OpenAI(
-                api_key=self.client.api_key,
-                base_url=self.client.base_url
+            response = await self.client.chat.completions.create(
+                model="pearl-ai",
+                messages=formatted_messages,
+                metadata=metadata
             )
-            
-            # Need to use sync client in async function
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: client.chat.completions.create(
-                    model="pearl-ai",
-                    messages=self.format_messages_for_pearl(messages),
-                    metadata=metadata
-                )
-            )
-            
-            # Store the response in conversation history
-            if session_id not in conversation_history:
-                # Initialize with the user's messages first
-                conversation_history[session_id] = messages.copy()
-            
-            # Add the assistant's response
-            conversation_history[session_id].append({
-                "role": "assistant",
-                "content": response.choices[0].message.content
-            })
-            
+            circuit_breaker.record_success()
             return response
-        except openai.UnprocessableEntityError as e:
-            # 422 error - expert verification in progress
-            print(f"Expert verification in progress (422 status). Will retry.")
+        except openai.UnprocessableEntityError:
+            # 422 error - expert verification in progress, not an outage.
+            # Pearl did answer, so a trial call through a half-open circuit closes it.
+            if trial:
+                circuit_breaker.record_success()
+            logger.info("Expert verification in progress (422 status). Will retry.")
             raise  # Re-raise to allow tenacity to retry
         except Exception as e:
             # For any other errors, don't retry
-            print(f"Error calling Pearl API: {e}")
+            if isinstance(e, (openai.APIConnectionError, openai.InternalServerError)):
+                circuit_breaker.record_failure()
+            elif trial:
+                circuit_breaker.release_trial()
+            logger.warning("Error calling Pearl API: %s", e)
             raise  # Non-422 errors won't be retried by tenacity
+        except BaseException:
+            # Cancelled before Pearl answered; free the trial slot for the next caller
+            if trial:
+                circuit_breaker.release_trial()
+            raise
     
-    def get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
+    async def get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
         """
         Get conversation history for a session
         
         Args:
             session_id: Session ID for the conversation
         """
-        return conversation_history.get(session_id, [])
+        return await conversation_history.get(session_id)
     
-    def add_user_message(self, session_id: str, message: str) -> None:
+    async def add_user_message(self, session_id: str, message: str) -> None:
         """
         Add a user message to the conversation history
         
@@ -128,15 +185,12 @@ class PearlApiClient:
             session_id: Session ID for the conversation
             message: User message text
         """
-        if session_id not in conversation_history:
-            conversation_history[session_id] = []
-        
-        conversation_history[session_id].append({
+        await conversation_history.append(session_id, {
             "role": "user",
             "content": message
         })
     
-    def add_message(self, session_id: str, role: str, content: str) -> None:
+    async def add_message(self, session_id: str, role: str, content: str) -> None:
         """
         Add a message to the conversation history with specified role
         
@@ -145,10 +199,7 @@ class PearlApiClient:
             role: Message role (user, assistant, system)
             content: Message content
         """
-        if session_id not in conversation_history:
-            conversation_history[session_id] = []
-        
-        conversation_history[session_id].append({
+        await conversation_history.append(session_id, {
             "role": role,
             "content": content
         })
\ No newline at end of file
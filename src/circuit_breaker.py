@@ -0,0 +1,75 @@
+import time
+from enum import Enum
+
+# Circuit breaker states
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreakerOpen(Exception):
+    """Raised when a call is rejected because the circuit breaker is open"""
+
+class CircuitBreaker:
+    """Stops calling a failing upstream until it has had time to recover"""
+
+    def __init__(self, fail_max: int, reset_timeout: float):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            fail_max: Consecutive failures after which the circuit opens
+            reset_timeout: Seconds to wait before letting a trial call through an open circuit
+        """
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def before_call(self) -> bool:
+        """
+        Check whether a call may proceed
+
+        Returns:
+            True if this call is the single trial call let through a half-open circuit
+
+        Raises:
+            CircuitBreakerOpen: If the circuit is open and the reset timeout has not elapsed,
+                or the circuit is half-open and its trial call is still outstanding
+        """
+        if self.state == CircuitState.OPEN:
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitBreakerOpen(
+                    f"Pearl API circuit breaker is open, retry in {remaining:.0f} seconds"
+                )
+            self.state = CircuitState.HALF_OPEN
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self.trial_in_flight:
+                raise CircuitBreakerOpen(
+                    "Pearl API circuit breaker is half-open and waiting on a trial call"
+                )
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit once the threshold is reached"""
+        self.failure_count += 1
+        self.trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.failure_count >= self.fail_max:
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Let another trial call through after one ended without telling whether the upstream recovered"""
+        self.trial_in_flight = False
@@ -15,11 +15,32 @@ class PearlMode(str, Enum):
 class Config:
     """Configuration class for Pearl MCP Server"""
     
-    # Default values
+    # Default values (retry settings are read once when api_client is imported)
     PEARL_API_BASE_URL = "https://api.pearl.com/api/v1/"
     MAX_RETRIES = 10
     MIN_RETRY_WAIT = 1
     MAX_RETRY_WAIT = 60
+    CIRCUIT_BREAKER_FAIL_MAX = int(os.getenv("PEARL_CIRCUIT_BREAKER_FAIL_MAX", "20"))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv("PEARL_CIRCUIT_BREAKER_RESET_TIMEOUT", "30"))
+    
+    # HTTP connection pool, tunable per deployment
+    MAX_CONNECTIONS = int(os.getenv("PEARL_MAX_CONNECTIONS", "2000"))
+    MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PEARL_MAX_KEEPALIVE_CONNECTIONS", "1500"))
+    KEEPALIVE_EXPIRY = 30.0
+    REQUEST_TIMEOUT = 120.0
+    
+    # Conversation history storage ("memory" or "redis") and bounds
+    CONVERSATION_BACKEND = os.getenv("CONVERSATION_BACKEND", "memory")
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_CACHE_SIZE = 1_000
+    CONVERSATION_TTL = 86_400
+    MAX_SESSIONS = 10_000
+    MAX_MESSAGES_PER_SESSION = 100
+    
+    # Active conversation bounds: LRU size, idle timeout and how often idle ones are swept (seconds)
+    MAX_ACTIVE_CONVERSATIONS = 10_000
+    CONVERSATION_IDLE_TIMEOUT = 3_600
+    CONVERSATION_CLEANUP_INTERVAL = 900
     
     # API key to be set at runtime
     PEARL_API_KEY: Optional[str] = os.getenv("PEARL_API_KEY")
@@ -0,0 +1,286 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Protocol
+
+# Redis backend is optional; the asyncio client keeps Redis round-trips off the event loop
+try:
+    from redis import asyncio as redis
+except ImportError:
+    redis = None
+
+from .config import Config
+
+class ConversationStore(Protocol):
+    """Storage backend for conversation message history, awaited from the tools' event loop"""
+
+    async def contains(self, session_id: str) -> bool: ...
+
+    async def get(self, session_id: str) -> List[Dict[str, Any]]: ...
+
+    async def set(self, session_id: str, messages: List[Dict[str, Any]]) -> None: ...
+
+    async def append(self, session_id: str, message: Dict[str, Any]) -> None: ...
+
+    async def delete(self, session_id: str) -> None: ...
+
+class InMemoryStore:
+    """Bounded, thread-safe in-memory store for conversation message history"""
+
+    def __init__(self, max_sessions: int = 10_000, max_messages_per_session: int = 100):
+        """
+        Initialize the conversation store
+
+        Args:
+            max_sessions: Maximum number of sessions kept; least recently used are evicted first
+            max_messages_per_session: Maximum number of messages kept per session
+        """
+        self.max_sessions = max_sessions
+        self.max_messages_per_session = max_messages_per_session
+        self._sessions: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def contains(self, session_id: str) -> bool:
+        """
+        Check whether a session has stored messages
+
+        Args:
+            session_id: Session ID for the conversation
+        """
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def get(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the messages stored for a session
+
+        Args:
+            session_id: Session ID for the conversation
+        """
+        with self._lock:
+            messages = self._sessions.get(session_id)
+            if messages is None:
+                return []
+            self._sessions.move_to_end(session_id)
+            return messages
+
+    async def set(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Replace the messages stored for a session
+
+        Args:
+            session_id: Session ID for the conversation
+            messages: New list of messages for the session
+        """
+        with self._lock:
+            self._sessions[session_id] = messages
+            self._sessions.move_to_end(session_id)
+            self._trim(messages)
+            self._evict()
+
+    async def append(self, session_id: str, message: Dict[str, Any]) -> None:
+        """
+        Append a message to a session, creating the session if needed
+
+        Args:
+            session_id: Session ID for the conversation
+            message: Message dict with role and content
+        """
+        with self._lock:
+            messages = self._sessions.setdefault(session_id, [])
+            self._sessions.move_to_end(session_id)
+            messages.append(message)
+            self._trim(messages)
+            self._evict()
+
+    async def delete(self, session_id: str) -> None:
+        """
+        Remove a session and its messages
+
+        Args:
+            session_id: Session ID for the conversation
+        """
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _trim(self, messages: List[Dict[str, Any]]) -> None:
+        """Drop the oldest messages in whole user/assistant pairs once over the limit"""
+        excess = len(messages) - self.max_messages_per_session
+        if excess > 0:
+            del messages[:excess + excess % 2]
+
+    def _evict(self) -> None:
+        """Evict least recently used sessions once over the limit"""
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+class RedisStore:
+    """
+    Redis-backed store for conversation message history, keeping it out of process memory.
+
+    Each session is a Redis list of JSON messages with an expiry. Recently used sessions
+    are also kept in a small in-process LRU cache so hot sessions skip the Redis round-trip;
+    the cache assumes this process is the only writer of its sessions.
+    """
+
+    KEY_PREFIX = "pearl:conv:"
+
+    def __init__(
+        self,
+        url: str,
+        ttl: int = 86_400,
+        max_messages_per_session: int = 100,
+        cache_size: int = 1_000
+    ):
+        """
+        Initialize the Redis store
+
+        Args:
+            url: Redis connection URL
+            ttl: Seconds a session is kept after its last update
+            max_messages_per_session: Maximum number of messages kept per session
+            cache_size: Number of recently used sessions cached in memory (0 disables the cache)
+
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        if redis is None:
+            raise ImportError("RedisStore requires the redis package: pip install 'pearl-mcp-server[redis]'")
+
+        self.redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.max_messages_per_session = max_messages_per_session
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def contains(self, session_id: str) -> bool:
+        """
+        Check whether a session has stored messages
+
+        Args:
+            session_id: Session ID for the conversation
+        """
+        with self._lock:
+            if session_id in self._cache:
+                return True
+        return bool(await self.redis.exists(self.KEY_PREFIX + session_id))
+
+    async def get(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the messages stored for a session
+
+        Args:
+            session_id: Session ID for the conversation
+        """
+        with self._lock:
+            messages = self._cache.get(session_id)
+            if messages is not None:
+                self._cache.move_to_end(session_id)
+                return messages
+
+        raw_messages = await self.redis.lrange(self.KEY_PREFIX + session_id, 0, -1)
+        messages = [json.loads(raw) for raw in raw_messages]
+        if messages:
+            self._cache_put(session_id, messages)
+        return messages
+
+    async def set(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Replace the messages stored for a session
+
+        Args:
+            session_id: Session ID for the conversation
+            messages: New list of messages for the session
+        """
+        excess = len(messages) - self.max_messages_per_session
+        if excess > 0:
+            del messages[:excess + excess % 2]
+
+        key = self.KEY_PREFIX + session_id
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        if messages:
+            pipe.rpush(key, *(json.dumps(message) for message in messages))
+            pipe.expire(key, self.ttl)
+        await pipe.execute()
+        if messages:
+            self._cache_put(session_id, messages)
+        else:
+            # An empty session has no Redis key, so it must not look present through the cache
+            with self._lock:
+                self._cache.pop(session_id, None)
+
+    async def append(self, session_id: str, message: Dict[str, Any]) -> None:
+        """
+        Append a message to a session, creating the session if needed
+
+        Args:
+            session_id: Session ID for the conversation
+            message: Message dict with role and content
+        """
+        key = self.KEY_PREFIX + session_id
+        pipe = self.redis.pipeline()
+        pipe.rpush(key, json.dumps(message))
+        pipe.expire(key, self.ttl)
+        length = (await pipe.execute())[0]
+
+        # Drop the oldest messages in whole user/assistant pairs once over the limit
+        excess = length - self.max_messages_per_session
+        if excess > 0:
+            await self.redis.ltrim(key, excess + excess % 2, -1)
+
+        with self._lock:
+            if length == 1:
+                # The key did not exist (e.g. it expired), so any cached history is stale
+                self._cache.pop(session_id, None)
+                return
+            messages = self._cache.get(session_id)
+            if messages is not None:
+                messages.append(message)
+                if excess > 0:
+                    del messages[:excess + excess % 2]
+
+    async def delete(self, session_id: str) -> None:
+        """
+        Remove a session and its messages
+
+        Args:
+            session_id: Session ID for the conversation
+        """
+        await self.redis.delete(self.KEY_PREFIX + session_id)
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def _cache_put(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Cache a session's messages, evicting the least recently used session"""
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[session_id] = messages
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+def create_conversation_store() -> ConversationStore:
+    """
+    Create the conversation store selected by Config.CONVERSATION_BACKEND
+
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    if Config.CONVERSATION_BACKEND == "memory":
+        return InMemoryStore(
+            max_sessions=Config.MAX_SESSIONS,
+            max_messages_per_session=Config.MAX_MESSAGES_PER_SESSION
+        )
+    if Config.CONVERSATION_BACKEND == "redis":
+        return RedisStore(
+            url=Config.REDIS_URL,
+            ttl=Config.CONVERSATION_TTL,
+            max_messages_per_session=Config.MAX_MESSAGES_PER_SESSION,
+            cache_size=Config.REDIS_CACHE_SIZE
+        )
+    raise ValueError(f"Unknown conversation backend: {Config.CONVERSATION_BACKEND}")
@@ -8,6 +8,12 @@ from starlette.applications import Starlette
 from starlette.responses import Response
 from starlette.routing import Mount, Route
 
+# uvloop is optional; uvicorn already picks it up automatically when installed
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Import local modules
 from .api_client import PearlApiClient
 from .config import Config
@@ -90,7 +96,7 @@ def main(api_key: str, port: int, transport: str) -> int:
                     await app._mcp_server.run(
                         streams[0], streams[1], app._mcp_server.create_initialization_options()
                     )
-            anyio.run(arun)
+            anyio.run(arun, backend_options={"use_uvloop": uvloop is not None})
 
         return 0
     except Exception as e:
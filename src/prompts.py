@@ -1,6 +1,33 @@
 from mcp import types
 from mcp.server.fastmcp import FastMCP
 
+# Prompt results are constant, so build them once at import
+_LEGAL_PROMPT_RESULT = types.GetPromptResult(
+    description="Template for asking legal questions to Pearl experts",
+    messages=[
+        types.PromptMessage(
+            role="user",
+            content=types.TextContent(
+                type="text",
+                text="I have a legal question about [TOPIC]. Specifically, I'd like to know [SPECIFIC QUESTION]. My situation is [BRIEF DESCRIPTION OF SITUATION]. What legal options do I have and what should I consider?"
+            )
+        )
+    ]
+)
+
+_MEDICAL_PROMPT_RESULT = types.GetPromptResult(
+    description="Template for asking medical questions to Pearl experts",
+    messages=[
+        types.PromptMessage(
+            role="user",
+            content=types.TextContent(
+                type="text",
+                text="I have a medical question about [CONDITION/SYMPTOM]. Specifically, I'm experiencing [SYMPTOMS] for [DURATION]. My medical history includes [RELEVANT HISTORY]. What could this indicate and what should I do next?"
+            )
+        )
+    ]
+)
+
 def register_prompts(mcp: FastMCP):
     """Register all prompts with the MCP server"""
     
@@ -9,33 +36,11 @@ def register_prompts(mcp: FastMCP):
         """
         Template for asking legal questions to Pearl experts
         """
-        return types.GetPromptResult(
-            description="Template for asking legal questions to Pearl experts",
-            messages=[
-                types.PromptMessage(
-                    role="user",
-                    content=types.TextContent(
-                        type="text",
-                        text="I have a legal question about [TOPIC]. Specifically, I'd like to know [SPECIFIC QUESTION]. My situation is [BRIEF DESCRIPTION OF SITUATION]. What legal options do I have and what should I consider?"
-                    )
-                )
-            ]
-        )
+        return _LEGAL_PROMPT_RESULT
 
     @mcp.prompt()
     def ask_medical_question() -> types.GetPromptResult:
         """
         Template for asking medical questions to Pearl experts
         """
-        return types.GetPromptResult(
-            description="Template for asking medical questions to Pearl experts",
-            messages=[
-                types.PromptMessage(
-                    role="user",
-                    content=types.TextContent(
-                        type="text",
-                        text="I have a medical question about [CONDITION/SYMPTOM]. Specifically, I'm experiencing [SYMPTOMS] for [DURATION]. My medical history includes [RELEVANT HISTORY]. What could this indicate and what should I do next?"
-                    )
-                )
-            ]
-        ) 
\ No newline at end of file
+        return _MEDICAL_PROMPT_RESULT 
\ No newline at end of file
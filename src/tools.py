@@ -1,20 +1,130 @@
-import json
-import uuid
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Awaitable, Callable, Dict, Any, Optional, List
 import logging
 
+import orjson
 from mcp.server.fastmcp import FastMCP
-from .config import PearlMode
+from .config import Config, PearlMode
 from .api_client import PearlApiClient, conversation_history
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Active conversations storage - shared across tools
-active_conversations: Dict[str, Dict[str, Any]] = {}
+@dataclass(slots=True)
+class ConversationMeta:
+    """Metadata tracked for an active conversation"""
+    mode: str
+    created_at: str
+    status: str
+    last_activity: Optional[str] = None
+    error: Optional[str] = None
 
-def process_conversation_history(session_id: str, question: str, chat_history: Optional[List[Dict[str, str]]], pearl_api_client: PearlApiClient) -> None:
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metadata as a dict, leaving out fields that were never set"""
+        data = {"mode": self.mode, "created_at": self.created_at, "status": self.status}
+        if self.last_activity is not None:
+            data["last_activity"] = self.last_activity
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+# Active conversations storage - shared across tools, ordered from least to most recently active
+active_conversations: OrderedDict[str, ConversationMeta] = OrderedDict()
+
+# Wall-clock time of the last sweep for idle conversations
+_last_cleanup = time.time()
+
+# Tool responses for a missing client or an unknown session
+_ERR_NO_CLIENT = "Error: Pearl API client is not initialized. Make sure to provide an API key."
+_ERR_NO_SESSION = "Error: No conversation found with session ID: %s"
+_NO_SESSION = "No conversation found with session ID: %s"
+
+# Speaker labels used when combining chat history into a single question
+_ROLE_PREFIXES = {
+    "user": "Customer: ",
+    "assistant": "AI Assistant: "
+}
+
+# Last formatted timestamp, refreshed at most once per second
+_timestamp_cache: List[Any] = [0, ""]
+
+def _now_iso() -> str:
+    """Current local time as an ISO 8601 string, at one-second resolution"""
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache[0] = now
+        _timestamp_cache[1] = datetime.fromtimestamp(now).isoformat()
+    return _timestamp_cache[1]
+
+async def _add_conversation(session_id: str, conversation: ConversationMeta) -> None:
+    """
+    Track a new conversation, evicting the least recently active ones once over the limit
+    
+    Conversations still waiting on a Pearl API call are skipped, so the limit can be
+    exceeded briefly while many calls are in flight.
+    
+    Args:
+        session_id: The session ID for the conversation
+        conversation: Conversation metadata
+    """
+    active_conversations[session_id] = conversation
+    excess = len(active_conversations) - Config.MAX_ACTIVE_CONVERSATIONS
+    if excess <= 0:
+        return
+    
+    evicted = []
+    for evicted_session_id, evicted_conversation in active_conversations.items():
+        if evicted_conversation.status != "in_progress":
+            evicted.append(evicted_session_id)
+            if len(evicted) == excess:
+                break
+    # Untrack every evicted session before the first await, so concurrent calls never see a half-done eviction
+    for evicted_session_id in evicted:
+        active_conversations.pop(evicted_session_id, None)
+    for evicted_session_id in evicted:
+        await conversation_history.delete(evicted_session_id)
+
+async def _cleanup_idle_conversations() -> None:
+    """Drop conversations idle for longer than the configured timeout, sweeping at most once per cleanup interval"""
+    global _last_cleanup
+    now = time.time()
+    if now - _last_cleanup < Config.CONVERSATION_CLEANUP_INTERVAL:
+        return
+    _last_cleanup = now
+    
+    # Oldest activity comes first, so stop at the first conversation that is still fresh
+    cutoff = now - Config.CONVERSATION_IDLE_TIMEOUT
+    expired = []
+    for session_id, conversation in active_conversations.items():
+        last_active = conversation.last_activity or conversation.created_at
+        if datetime.fromisoformat(last_active).timestamp() >= cutoff:
+            break
+        # Keep conversations still waiting on a Pearl API call, or their answer would be stored for a dropped session
+        if conversation.status != "in_progress":
+            expired.append(session_id)
+    # Untrack every expired session before the first await, so concurrent calls never see a half-done sweep
+    for session_id in expired:
+        active_conversations.pop(session_id, None)
+    for session_id in expired:
+        await conversation_history.delete(session_id)
+
+def _dumps(obj: Any, indent: bool = True) -> str:
+    """
+    Serialize a tool response as JSON
+    
+    Args:
+        obj: Object to serialize
+        indent: Whether to indent the output; compact output suits large machine-read payloads
+    """
+    if indent:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return orjson.dumps(obj).decode()
+
+async def process_conversation_history(session_id: str, question: str, chat_history: Optional[List[Dict[str, str]]], add_user_message: Callable[[str, str], Awaitable[None]]) -> None:
     """
     Process and store conversation history for a session
     
@@ -22,101 +132,131 @@ def process_conversation_history(session_id: str, question: str, chat_history: O
         session_id: The session ID for the conversation
         question: The current question from the user
         chat_history: Optional full conversation history between user and Claude
-        pearl_api_client: The Pearl API client instance
+        add_user_message: Coroutine function storing a single user message for a session
     """
     if chat_history:
         # Skip combining if there's only one message from the user
         if len(chat_history) == 1 and chat_history[0]["role"] == "user":
-            # Clear any existing conversation
-            conversation_history[session_id] = []
-            # Add the single user message directly
-            conversation_history[session_id].append(chat_history[0])
+            # Replace any existing conversation with the single user message
+            await conversation_history.set(session_id, [chat_history[0]])
         else:
             # For history with multiple messages, combine into a single formatted question
-            combined_question = ""
+            parts = []
+            append = parts.append
             
             for message in chat_history:
-                role = message["role"]
-                content = message["content"]
-                
-                if role == "user":
-                    combined_question += f"Customer: {content}\n\n"
-                elif role == "assistant":
-                    combined_question += f"AI Assistant: {content}\n\n"
+                # Messages with other roles (e.g. system) are left out
+                prefix = _ROLE_PREFIXES.get(message["role"])
+                if prefix is not None:
+                    append(prefix)
+                    append(message["content"])
+                    append("\n\n")
             
-            # Clear any existing conversation to replace with the combined question
-            conversation_history[session_id] = []
+            combined_question = "".join(parts)
             
-            # Store the combined question as a single message
-            conversation_history[session_id].append({
+            # Replace any existing conversation with the combined question as a single message
+            await conversation_history.set(session_id, [{
                 "role": "user",
                 "content": combined_question
-            })
+            }])
     else:
         # Just add the current question if no history provided
-        pearl_api_client.add_user_message(session_id, question)
+        await add_user_message(session_id, question)
 
 def register_tools(mcp: FastMCP, pearl_api_client: PearlApiClient):
     """Register all tools with the MCP server"""
     
-    @mcp.tool()
-    async def ask_pearl_ai(question: str, chat_history: Optional[List[Dict[str, str]]] = None, session_id: Optional[str] = None) -> str:
+    # Bind client methods once so the tool closures don't resolve them on every call
+    get_history = pearl_api_client.get_conversation_history
+    call_api = pearl_api_client.call_api_with_retry
+    add_user_message = pearl_api_client.add_user_message
+    
+    async def _run_tool(
+        mode: PearlMode,
+        tool_name: str,
+        question: str,
+        chat_history: Optional[List[Dict[str, str]]],
+        session_id: Optional[str],
+        error_message: str,
+        start_message: Optional[str] = None
+    ) -> str:
         """
-        Get help from advanced Pearl AI Assistant. Provides a quick AI-only response without human review.
-        Use when: 
-            - Use when the user asks for another opinion or alternative view
-            - Good for non-critical situations where diverse perspectives are helpful
-            - Useful when user is comparing different approaches or solutions
+        Shared implementation of the ask_* tools
         
         Args:
+            mode: Pearl API mode to call
+            tool_name: Name of the calling tool, used in the suggested next steps
             question: The current question or latest message from the user
-            chat_history: Optional conversation history. This ensures Pearl AI Assistant see the complete context
+            chat_history: Optional conversation history
             session_id: Optional session ID for continuing a conversation
+            error_message: Message returned to the client when the Pearl API call fails
+            start_message: Optional message logged before calling the Pearl API
         """
         if not pearl_api_client:
-            return "Error: Pearl API client is not initialized. Make sure to provide an API key."
+            return _ERR_NO_CLIENT
+        
+        await _cleanup_idle_conversations()
         
         # Use provided session_id or create a new one
-        if not session_id:
-            session_id = str(uuid.uuid4())
+        new_session = not session_id
+        if new_session:
+            session_id = secrets.token_hex(16)
             # Create new conversation entry
-            active_conversations[session_id] = {
-                "mode": PearlMode.AI_ONLY,
-                "created_at": datetime.now().isoformat(),
-                "status": "in_progress"
-            }
+            conversation = ConversationMeta(
+                mode=mode.value,
+                created_at=_now_iso(),
+                status="in_progress"
+            )
+            await _add_conversation(session_id, conversation)
         elif session_id not in active_conversations:
-            return f"Error: No conversation found with session ID: {session_id}"
+            return _ERR_NO_SESSION % session_id
         else:
-            # Update existing conversation
-            active_conversations[session_id]["status"] = "in_progress"
-            active_conversations[session_id]["last_activity"] = datetime.now().isoformat()
+            # Update existing conversation and mark it as most recently active
+            conversation = active_conversations[session_id]
+            conversation.status = "in_progress"
+            conversation.last_activity = _now_iso()
+            active_conversations.move_to_end(session_id)
         
+        if start_message:
+            logger.info(start_message)
+        
+        # Status is written once, whichever way the call ends
+        status = "failed"
         try:
-            # Process conversation history
-            process_conversation_history(session_id, question, chat_history, pearl_api_client)
+            if new_session and not chat_history:
+                # First turn without history: the question alone starts the conversation
+                await conversation_history.set(session_id, [{"role": "user", "content": question}])
+            else:
+                # Process conversation history
+                await process_conversation_history(session_id, question, chat_history, add_user_message)
             
             # Get the full conversation history
-            messages = pearl_api_client.get_conversation_history(session_id)
+            messages = await get_history(session_id)
             
             # Call Pearl API with the full conversation history
-            response = await pearl_api_client.call_api_with_retry(
+            response = await call_api(
                 messages,
                 session_id,
-                PearlMode.AI_ONLY
+                mode,
+                track_history=True
             )
-            
-            # Update conversation status
-            active_conversations[session_id]["status"] = "completed"
+            answer = response.choices[0].message.content
+        except Exception as e:
+            error = str(e)
+            conversation.error = error
+            logger.error("%s failed: %s", tool_name, error)
+            return f"Error: {error_message} {error}"
+        else:
+            status = "completed"
             
             # Return the response content and session ID for continued conversation
             result = {
-                "answer": response.choices[0].message.content,
+                "answer": answer,
                 "session_id": session_id,
-                "status": "completed",
+                "status": status,
                 "next_steps": {
                     "continue_conversation": {
-                        "tool": "ask_pearl_ai",
+                        "tool": tool_name,
                         "parameters": {
                             "question": "Your follow-up question here",
                             "session_id": session_id
@@ -130,12 +270,28 @@ def register_tools(mcp: FastMCP, pearl_api_client: PearlApiClient):
                     }
                 }
             }
-            return json.dumps(result, indent=2)
-            
-        except Exception as e:
-            active_conversations[session_id]["status"] = "failed"
-            active_conversations[session_id]["error"] = str(e)
-            return f"Error: Failed to get response from Pearl AI. {str(e)}"
+            return _dumps(result)
+        finally:
+            conversation.status = status
+
+    @mcp.tool()
+    async def ask_pearl_ai(question: str, chat_history: Optional[List[Dict[str, str]]] = None, session_id: Optional[str] = None) -> str:
+        """
+        Get help from advanced Pearl AI Assistant. Provides a quick AI-only response without human review.
+        Use when: 
+            - Use when the user asks for another opinion or alternative view
+            - Good for non-critical situations where diverse perspectives are helpful
+            - Useful when user is comparing different approaches or solutions
+        
+        Args:
+            question: The current question or latest message from the user
+            chat_history: Optional conversation history. This ensures Pearl AI Assistant see the complete context
+            session_id: Optional session ID for continuing a conversation
+        """
+        return await _run_tool(
+            PearlMode.AI_ONLY, "ask_pearl_ai", question, chat_history, session_id,
+            error_message="Failed to get response from Pearl AI."
+        )
 
     @mcp.tool()
     async def ask_pearl_expert(question: str, chat_history: Optional[List[Dict[str, str]]] = None, session_id: Optional[str] = None) -> str:
@@ -155,73 +311,11 @@ def register_tools(mcp: FastMCP, pearl_api_client: PearlApiClient):
             chat_history: Optional conversation history. This ensures experts see the complete context
             session_id: Optional session ID for continuing a conversation
         """
-        if not pearl_api_client:
-            return "Error: Pearl API client is not initialized. Make sure to provide an API key."
-        
-        # Use provided session_id or create a new one
-        if not session_id:
-            session_id = str(uuid.uuid4())
-            # Create new conversation entry
-            active_conversations[session_id] = {
-                "mode": PearlMode.AI_EXPERT,
-                "created_at": datetime.now().isoformat(),
-                "status": "in_progress"
-            }
-        elif session_id not in active_conversations:
-            return f"Error: No conversation found with session ID: {session_id}"
-        else:
-            # Update existing conversation
-            active_conversations[session_id]["status"] = "in_progress"
-            active_conversations[session_id]["last_activity"] = datetime.now().isoformat()
-        
-        # Process conversation history
-        process_conversation_history(session_id, question, chat_history, pearl_api_client)
-        
-        # Notify client that we're processing and waiting for expert connection
-        logger.info("Starting connection...")
-        
-        try:
-            # Get the conversation history
-            messages = pearl_api_client.get_conversation_history(session_id)
-            
-            # Call Pearl API with the conversation history
-            response = await pearl_api_client.call_api_with_retry(
-                messages,
-                session_id,
-                PearlMode.AI_EXPERT
-            )
-            
-            # Update conversation status
-            active_conversations[session_id]["status"] = "completed"
-            
-            # Return the response content and session ID for continued conversation
-            result = {
-                "answer": response.choices[0].message.content,
-                "session_id": session_id,
-                "status": "completed",
-                "next_steps": {
-                    "continue_conversation": {
-                        "tool": "ask_pearl_expert",
-                        "parameters": {
-                            "question": "Your follow-up question here",
-                            "session_id": session_id
-                        }
-                    },
-                    "view_history": {
-                        "tool": "get_conversation_history",
-                        "parameters": {
-                            "session_id": session_id
-                        }
-                    }
-                }
-            }
-            return json.dumps(result, indent=2)
-            
-        except Exception as e:
-            active_conversations[session_id]["status"] = "failed"
-            active_conversations[session_id]["error"] = str(e)
-            logger.error(f"Failed to connect with expert: {str(e)}")
-            return f"Error: Failed to connect with expert after multiple attempts. {str(e)}"
+        return await _run_tool(
+            PearlMode.AI_EXPERT, "ask_pearl_expert", question, chat_history, session_id,
+            error_message="Failed to connect with expert after multiple attempts.",
+            start_message="Starting connection..."
+        )
 
     @mcp.tool()
     async def ask_expert(question: str, chat_history: Optional[List[Dict[str, str]]] = None, session_id: Optional[str] = None) -> str:
@@ -239,104 +333,43 @@ def register_tools(mcp: FastMCP, pearl_api_client: PearlApiClient):
             chat_history: Optional full conversation history between user and Claude
             session_id: Optional session ID to continue an existing conversation
         """
-        if not pearl_api_client:
-            return "Error: Pearl API client is not initialized. Make sure to provide an API key."
-        
-        # Use provided session_id or create a new one
-        if not session_id:
-            session_id = str(uuid.uuid4())
-            # Create new conversation entry
-            active_conversations[session_id] = {
-                "mode": PearlMode.EXPERT,
-                "created_at": datetime.now().isoformat(),
-                "status": "in_progress"
-            }
-        elif session_id not in active_conversations:
-            return f"Error: No conversation found with session ID: {session_id}"
-        else:
-            # Update existing conversation
-            active_conversations[session_id]["status"] = "in_progress"
-            active_conversations[session_id]["last_activity"] = datetime.now().isoformat()
-        
-        # Process conversation history
-        process_conversation_history(session_id, question, chat_history, pearl_api_client)
-        
-        # Notify client that we're waiting for expert response
-        logger.info("Connecting to human expert...")
-        
-        try:
-            # Get the conversation history
-            messages = pearl_api_client.get_conversation_history(session_id)
-            
-            # Call Pearl API with the conversation history
-            response = await pearl_api_client.call_api_with_retry(
-                messages,
-                session_id,
-                PearlMode.EXPERT
-            )
-            
-            # Update conversation status
-            active_conversations[session_id]["status"] = "completed"
-            
-            # Return the response content and session ID for continued conversation
-            result = {
-                "answer": response.choices[0].message.content,
-                "session_id": session_id,
-                "status": "completed",
-                "next_steps": {
-                    "continue_conversation": {
-                        "tool": "ask_expert",
-                        "parameters": {
-                            "question": "Your follow-up question here",
-                            "session_id": session_id
-                        }
-                    },
-                    "view_history": {
-                        "tool": "get_conversation_history",
-                        "parameters": {
-                            "session_id": session_id
-                        }
-                    }
-                }
-            }
-            return json.dumps(result, indent=2)
-            
-        except Exception as e:
-            active_conversations[session_id]["status"] = "failed"
-            active_conversations[session_id]["error"] = str(e)
-            logger.error(f"Failed to connect with expert: {str(e)}")
-            return f"Error: Failed to connect with expert. {str(e)}"
+        return await _run_tool(
+            PearlMode.EXPERT, "ask_expert", question, chat_history, session_id,
+            error_message="Failed to connect with expert.",
+            start_message="Connecting to human expert..."
+        )
 
     @mcp.tool()
-    def get_conversation_status(session_id: str) -> str:
+    async def get_conversation_status(session_id: str) -> str:
         """
         Get the status of an active conversation
         
         Args:
             session_id: The session ID of the conversation
         """
-        if session_id in active_conversations:
-            # Include message history count
-            status_data = active_conversations[session_id].copy()
-            history = pearl_api_client.get_conversation_history(session_id)
-            status_data["message_count"] = len(history)
-            return json.dumps(status_data, indent=2)
-        else:
-            return f"No conversation found with session ID: {session_id}"
+        conversation = active_conversations.get(session_id)
+        if conversation is None:
+            return _NO_SESSION % session_id
+        
+        # Include message history count
+        status_data = conversation.to_dict()
+        history = await get_history(session_id)
+        status_data["message_count"] = len(history)
+        return _dumps(status_data, indent=False)
             
     @mcp.tool()
-    def get_conversation_history(session_id: str) -> str:
+    async def get_conversation_history(session_id: str) -> str:
         """
         Get the full conversation history for a session
         
         Args:
             session_id: The session ID of the conversation
         """
-        if session_id in active_conversations:
-            history = pearl_api_client.get_conversation_history(session_id)
-            return json.dumps(history, indent=2)
-        else:
-            return f"No conversation found with session ID: {session_id}"
+        if session_id not in active_conversations:
+            return _NO_SESSION % session_id
+        
+        history = await get_history(session_id)
+        return _dumps(history, indent=False)
             
     # Return the active_conversations dict for access from the main module
     return active_conversations 
\ No newline at end of file
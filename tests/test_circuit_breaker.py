@@ -0,0 +1,89 @@
+import pytest
+
+from src import circuit_breaker as circuit_breaker_module
+from src.circuit_breaker import CircuitBreaker, CircuitBreakerOpen, CircuitState
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock, advanced by assigning to clock[0]"""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", lambda: now[0])
+    return now
+
+def open_breaker(clock) -> CircuitBreaker:
+    """Return a breaker that has just opened after reaching its failure threshold"""
+    breaker = CircuitBreaker(fail_max=3, reset_timeout=30)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+def test_closed_breaker_lets_calls_through(clock):
+    breaker = CircuitBreaker(fail_max=3, reset_timeout=30)
+    assert breaker.before_call() is False
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.before_call() is False
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(fail_max=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_count == 1
+
+def test_opens_after_fail_max_failures(clock):
+    breaker = open_breaker(clock)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.before_call()
+
+def test_stays_open_until_reset_timeout(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 29
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.before_call()
+    assert breaker.state == CircuitState.OPEN
+
+def test_half_open_lets_one_trial_call_through(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.before_call() is True
+    assert breaker.state == CircuitState.HALF_OPEN
+    for _ in range(4):
+        with pytest.raises(CircuitBreakerOpen):
+            breaker.before_call()
+
+def test_successful_trial_closes_circuit(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_count == 0
+    assert breaker.before_call() is False
+    assert breaker.before_call() is False
+
+def test_failed_trial_reopens_circuit(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.before_call()
+
+    # The reset timeout restarts from the failed trial
+    clock[0] += 30
+    assert breaker.before_call() is True
+
+def test_released_trial_lets_next_caller_try(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.release_trial()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.before_call() is True
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from src.conversation_store import InMemoryStore, RedisStore
+
+def user(content: str):
+    return {"role": "user", "content": content}
+
+def assistant(content: str):
+    return {"role": "assistant", "content": content}
+
+@pytest.mark.asyncio
+async def test_memory_set_trims_whole_pairs():
+    store = InMemoryStore(max_sessions=10, max_messages_per_session=4)
+    await store.set("s", [user("q1"), assistant("a1"), user("q2"), assistant("a2"), user("q3")])
+
+    assert await store.get("s") == [user("q2"), assistant("a2"), user("q3")]
+
+@pytest.mark.asyncio
+async def test_memory_append_trims_whole_pairs():
+    store = InMemoryStore(max_sessions=10, max_messages_per_session=4)
+    await store.set("s", [user("q1"), assistant("a1"), user("q2"), assistant("a2")])
+    await store.append("s", user("q3"))
+
+    assert await store.get("s") == [user("q2"), assistant("a2"), user("q3")]
+
+@pytest.mark.asyncio
+async def test_memory_append_creates_session():
+    store = InMemoryStore(max_sessions=10, max_messages_per_session=4)
+    await store.append("s", user("q1"))
+
+    assert await store.contains("s")
+    assert await store.get("s") == [user("q1")]
+
+@pytest.mark.asyncio
+async def test_memory_evicts_least_recently_used_session():
+    store = InMemoryStore(max_sessions=2, max_messages_per_session=4)
+    await store.set("s1", [user("q1")])
+    await store.set("s2", [user("q2")])
+
+    # Reading s1 makes s2 the least recently used session
+    await store.get("s1")
+    await store.set("s3", [user("q3")])
+
+    assert await store.contains("s1")
+    assert not await store.contains("s2")
+    assert await store.contains("s3")
+    assert len(store) == 2
+
+@pytest.mark.asyncio
+async def test_memory_delete():
+    store = InMemoryStore(max_sessions=10, max_messages_per_session=4)
+    await store.set("s", [user("q1")])
+    await store.delete("s")
+
+    assert not await store.contains("s")
+    assert await store.get("s") == []
+
+@pytest.fixture
+def redis_store():
+    """RedisStore backed by an in-process fake Redis server"""
+    fakeredis = pytest.importorskip("fakeredis")
+    store = RedisStore("redis://localhost:6379/0", ttl=60, max_messages_per_session=4, cache_size=2)
+    store.redis = fakeredis.FakeAsyncRedis()
+    return store
+
+async def stored_in_redis(store: RedisStore, session_id: str):
+    """Read a session straight from Redis, bypassing the cache"""
+    raw_messages = await store.redis.lrange(store.KEY_PREFIX + session_id, 0, -1)
+    return [json.loads(raw) for raw in raw_messages]
+
+@pytest.mark.asyncio
+async def test_redis_set_and_get(redis_store):
+    await redis_store.set("s", [user("q1")])
+
+    assert await redis_store.contains("s")
+    assert await redis_store.get("s") == [user("q1")]
+    assert await stored_in_redis(redis_store, "s") == [user("q1")]
+    assert await redis_store.redis.ttl(redis_store.KEY_PREFIX + "s") == 60
+
+@pytest.mark.asyncio
+async def test_redis_get_missing_session(redis_store):
+    assert not await redis_store.contains("missing")
+    assert await redis_store.get("missing") == []
+
+@pytest.mark.asyncio
+async def test_redis_get_reads_through_to_redis(redis_store):
+    await redis_store.set("s", [user("q1")])
+    redis_store._cache.clear()
+
+    assert await redis_store.get("s") == [user("q1")]
+    assert "s" in redis_store._cache
+
+@pytest.mark.asyncio
+async def test_redis_append_keeps_cache_and_redis_in_step(redis_store):
+    await redis_store.set("s", [user("q1")])
+    await redis_store.append("s", assistant("a1"))
+
+    assert await redis_store.get("s") == [user("q1"), assistant("a1")]
+    assert await stored_in_redis(redis_store, "s") == [user("q1"), assistant("a1")]
+
+@pytest.mark.asyncio
+async def test_redis_set_trims_whole_pairs(redis_store):
+    messages = [user("q1"), assistant("a1"), user("q2"), assistant("a2"), user("q3")]
+    await redis_store.set("s", messages)
+
+    expected = [user("q2"), assistant("a2"), user("q3")]
+    assert await redis_store.get("s") == expected
+    assert await stored_in_redis(redis_store, "s") == expected
+
+@pytest.mark.asyncio
+async def test_redis_append_trims_whole_pairs(redis_store):
+    await redis_store.set("s", [user("q1"), assistant("a1"), user("q2"), assistant("a2")])
+    await redis_store.append("s", user("q3"))
+
+    expected = [user("q2"), assistant("a2"), user("q3")]
+    assert await redis_store.get("s") == expected
+    assert await stored_in_redis(redis_store, "s") == expected
+
+@pytest.mark.asyncio
+async def test_redis_delete(redis_store):
+    await redis_store.set("s", [user("q1")])
+    await redis_store.delete("s")
+
+    assert not await redis_store.contains("s")
+    assert await redis_store.get("s") == []
+
+@pytest.mark.asyncio
+async def test_redis_set_empty_is_not_cached(redis_store):
+    await redis_store.set("s", [user("q1")])
+    await redis_store.set("s", [])
+
+    assert not await redis_store.contains("s")
+    assert await redis_store.get("s") == []
+
+@pytest.mark.asyncio
+async def test_redis_append_after_key_expired_drops_stale_cache(redis_store):
+    await redis_store.set("s", [user("q1"), assistant("a1")])
+    await redis_store.redis.delete(redis_store.KEY_PREFIX + "s")  # as if the TTL ran out
+
+    await redis_store.append("s", user("q2"))
+
+    assert await redis_store.get("s") == [user("q2")]
+    assert await stored_in_redis(redis_store, "s") == [user("q2")]
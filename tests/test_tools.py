@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from src import tools
+from src.config import Config
+from src.tools import ConversationMeta
+
+OLD_TIMESTAMP = "2000-01-01T00:00:00"
+
+class YieldingStore:
+    """Conversation store whose deletes yield to the event loop, like a network-backed store"""
+
+    def __init__(self):
+        self.deleted = []
+        self.tracked_at_delete = []
+
+    async def delete(self, session_id: str) -> None:
+        self.tracked_at_delete.append(set(tools.active_conversations))
+        await asyncio.sleep(0)
+        self.deleted.append(session_id)
+
+@pytest.fixture
+def store(monkeypatch):
+    """Empty active_conversations backed by a yielding store"""
+    store = YieldingStore()
+    monkeypatch.setattr(tools, "conversation_history", store)
+    monkeypatch.setattr(tools, "active_conversations", tools.OrderedDict())
+    monkeypatch.setattr(Config, "MAX_ACTIVE_CONVERSATIONS", 3)
+    monkeypatch.setattr(tools, "_last_cleanup", 0)
+    return store
+
+def conversation(status: str, created_at: str = OLD_TIMESTAMP) -> ConversationMeta:
+    return ConversationMeta(mode="expert", created_at=created_at, status=status)
+
+@pytest.mark.asyncio
+async def test_add_conversation_evicts_least_recent_idle_sessions(store):
+    for session_id, status in (("s0", "in_progress"), ("s1", "completed"), ("s2", "failed")):
+        tools.active_conversations[session_id] = conversation(status)
+
+    await tools._add_conversation("s3", conversation("in_progress"))
+
+    assert list(tools.active_conversations) == ["s0", "s2", "s3"]
+    assert store.deleted == ["s1"]
+
+@pytest.mark.asyncio
+async def test_cleanup_skips_fresh_and_in_progress_sessions(store):
+    tools.active_conversations["s0"] = conversation("completed")
+    tools.active_conversations["s1"] = conversation("in_progress")
+    tools.active_conversations["s2"] = conversation("failed")
+    tools.active_conversations["s3"] = conversation("completed", created_at=tools._now_iso())
+
+    await tools._cleanup_idle_conversations()
+
+    assert list(tools.active_conversations) == ["s1", "s3"]
+    assert store.deleted == ["s0", "s2"]
+
+@pytest.mark.asyncio
+async def test_cleanup_untracks_sessions_before_deleting_history(store):
+    for session_id in ("s0", "s1", "s2"):
+        tools.active_conversations[session_id] = conversation("completed")
+
+    await tools._cleanup_idle_conversations()
+
+    # No expired session was still trackable, and so continuable, while its history was deleted
+    assert all(not tracked for tracked in store.tracked_at_delete)
+
+@pytest.mark.asyncio
+async def test_concurrent_eviction_and_cleanup_do_not_collide(store, monkeypatch):
+    # Small enough that the eviction picks a session the sweep has already chosen
+    monkeypatch.setattr(Config, "MAX_ACTIVE_CONVERSATIONS", 2)
+    for session_id in ("s0", "s1", "s2"):
+        tools.active_conversations[session_id] = conversation("completed")
+
+    results = await asyncio.gather(
+        tools._cleanup_idle_conversations(),
+        tools._add_conversation("s3", conversation("in_progress")),
+        return_exceptions=True
+    )
+
+    assert results == [None, None]
+    assert list(tools.active_conversations) == ["s3"]